@@ -4,8 +4,14 @@
 """
 
 import asyncio
+import atexit
+import base64
 import contextlib
+import functools
 import logging
+import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Callable
@@ -13,11 +19,130 @@ from typing import Generator
 from typing import Optional
 
 import docker
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
-# 创建线程池执行器
-_thread_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="docker_worker")
+# SDK同步调用（ping/info/list/tag/remove等轻量操作）经此线程池执行；
+# pull/push流已直连Engine HTTP API，不占用线程
+_meta_pool = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 4) * 2), thread_name_prefix="docker_meta"
+)
+
+# 共享的Docker客户端单例，复用底层HTTP连接池
+_client_lock = threading.Lock()
+_client: Optional[docker.DockerClient] = None
+
+
+def _close_shared_client():
+    """进程退出时关闭共享客户端"""
+    global _client
+    if _client is not None:
+        try:
+            _client.close()
+            logger.debug("共享Docker客户端已关闭")
+        except Exception as e:
+            logger.warning(f"关闭Docker客户端时出现警告: {e}")
+        _client = None
+
+
+atexit.register(_close_shared_client)
+
+
+class _TTLCache:
+    """简单的带过期时间缓存，用于合并高频的ping/info查询"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Any:
+        """返回未过期的缓存值，不存在或已过期返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, value = entry
+            if time.monotonic() >= expiry:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# ping结果缓存时间短于info，保证健康检查更及时
+_status_cache = _TTLCache()
+_PING_TTL = 2.0
+_INFO_TTL = 5.0
+
+# 匿名registry认证头（Engine API要求携带X-Registry-Auth），
+# 仅在本地没有对应registry凭据时使用
+_ANON_REGISTRY_AUTH = base64.urlsafe_b64encode(b"{}").decode()
+
+
+@functools.lru_cache(maxsize=32)
+def _registry_auth_header(repository: str) -> str:
+    """
+    解析repository所属registry的认证头
+
+    与SDK行为一致：从~/.docker/config.json（含credential helper）解析
+    凭据，未登录的registry回退为匿名空认证。进程内按repository缓存，
+    改过docker login后需重启进程生效。
+    """
+    try:
+        registry, _ = docker.auth.resolve_repository_name(repository)
+        authcfg = docker.auth.resolve_authconfig(docker.auth.load_config(), registry)
+        if authcfg:
+            return docker.auth.encode_header(authcfg).decode()
+    except Exception as e:
+        logger.warning(f"解析registry凭据失败，使用匿名认证: {e}")
+    return _ANON_REGISTRY_AUTH
+
+# 直连Docker Engine HTTP API的异步客户端，pull/push流式读取不再占用线程
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_async_http_client() -> httpx.AsyncClient:
+    """
+    根据DOCKER_HOST构建异步Engine API客户端
+
+    与docker SDK保持一致：未设置或unix://走本地socket，tcp://走HTTP；
+    其他协议直接报错，避免与SDK客户端连到不同的守护进程。
+    """
+    host = os.environ.get("DOCKER_HOST", "")
+    timeout = httpx.Timeout(None)
+    if not host or host.startswith("unix://"):
+        uds = host[len("unix://"):] if host else "/var/run/docker.sock"
+        transport = httpx.AsyncHTTPTransport(uds=uds)
+        return httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=timeout)
+    if host.startswith("tcp://"):
+        return httpx.AsyncClient(base_url="http://" + host[len("tcp://"):], timeout=timeout)
+    raise ValueError(f"不支持的DOCKER_HOST协议: {host}")
+
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    """懒初始化共享的异步Engine API客户端"""
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = _build_async_http_client()
+    return _async_http_client
+
+
+def _split_repo_tag(image_name: str) -> tuple[str, str]:
+    """拆分repository和tag，tag缺省为latest"""
+    head, sep, tail = image_name.rpartition('/')
+    if ':' in tail:
+        name, _, tag = tail.rpartition(':')
+        return (f"{head}/{name}" if sep else name), tag
+    return image_name, "latest"
 
 
 class DockerManager:
@@ -32,44 +157,48 @@ class DockerManager:
         使用方法:
         with DockerManager.get_client() as client:
             client.images.list()
+
+        客户端是懒初始化的进程级单例，复用底层HTTP连接，
+        退出上下文时不会关闭，进程退出时统一关闭。
         """
-        client = None
+        global _client
         try:
-            client = docker.from_env()
-            logger.debug("Docker客户端创建成功")
-            yield client
+            if _client is None:
+                with _client_lock:
+                    if _client is None:
+                        _client = docker.from_env()
+                        logger.debug("Docker客户端创建成功")
+            yield _client
         except docker.errors.DockerException as e:
             logger.error(f"创建Docker客户端失败: {e}")
             raise
         except Exception as e:
             logger.error(f"Docker客户端操作异常: {e}")
             raise
-        finally:
-            if client:
-                try:
-                    client.close()
-                    logger.debug("Docker客户端已关闭")
-                except Exception as e:
-                    logger.warning(f"关闭Docker客户端时出现警告: {e}")
     
     # ==================== 连接管理 ====================
     
     @staticmethod
     def test_connection() -> bool:
-        """同步测试Docker连接"""
+        """同步测试Docker连接（结果短暂缓存，合并重复健康检查）"""
+        cached = _status_cache.get("ping")
+        if cached is not None:
+            return cached
         try:
             with DockerManager.get_client() as client:
                 client.ping()
+                _status_cache.set("ping", True, _PING_TTL)
                 return True
         except Exception as e:
             logger.error(f"Docker连接测试失败: {e}")
+            _status_cache.invalidate("ping")
             return False
     
     @staticmethod
     async def test_connection_async() -> bool:
         """异步测试Docker连接"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.test_connection)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.test_connection)
     
     @staticmethod
     def get_connection_error_info() -> str:
@@ -88,26 +217,32 @@ class DockerManager:
     @staticmethod
     async def get_connection_error_info_async() -> str:
         """异步获取连接错误信息"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.get_connection_error_info)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.get_connection_error_info)
     
     # ==================== 信息获取 ====================
     
     @staticmethod
     def get_docker_info() -> Optional[dict]:
-        """同步获取Docker信息"""
+        """同步获取Docker信息（结果短暂缓存）"""
+        cached = _status_cache.get("info")
+        if cached is not None:
+            return cached
         try:
             with DockerManager.get_client() as client:
-                return client.info()
+                info = client.info()
+                _status_cache.set("info", info, _INFO_TTL)
+                return info
         except Exception as e:
             logger.error(f"获取Docker信息失败: {e}")
+            _status_cache.invalidate("info")
             return None
     
     @staticmethod
     async def get_docker_info_async() -> Optional[dict]:
         """异步获取Docker信息"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.get_docker_info)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.get_docker_info)
     
     # ==================== 镜像操作 ====================
     
@@ -117,11 +252,37 @@ class DockerManager:
         with DockerManager.get_client() as client:
             return client.images.pull(image_name)
     
+    @staticmethod
+    def _get_image(image_name: str) -> Any:
+        """同步获取本地镜像对象"""
+        with DockerManager.get_client() as client:
+            return client.images.get(image_name)
+
     @staticmethod
     async def pull_image_async(image_name: str) -> Any:
-        """异步拉取镜像"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.pull_image, image_name)
+        """
+        异步拉取镜像
+
+        直接走Docker Engine HTTP API流式拉取，不经过线程池，
+        完成后返回SDK镜像对象供后续tag使用。
+        """
+        repository, tag = _split_repo_tag(image_name)
+        client = _get_async_http_client()
+        async with client.stream(
+            "POST",
+            "/images/create",
+            params={"fromImage": repository, "tag": tag},
+            headers={"X-Registry-Auth": _registry_auth_header(repository)},
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_lines():
+                if not chunk:
+                    continue
+                line = orjson.loads(chunk)
+                if 'error' in line:
+                    raise docker.errors.APIError(line['error'])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager._get_image, image_name)
     
     @staticmethod
     def tag_image(image: Any, new_domain: str, bucket: str, name: str) -> bool:
@@ -140,8 +301,8 @@ class DockerManager:
     @staticmethod
     async def tag_image_async(image: Any, new_domain: str, bucket: str, name: str) -> bool:
         """异步重标签镜像"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.tag_image, image, new_domain, bucket, name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.tag_image, image, new_domain, bucket, name)
     
     @staticmethod
     def push_image(image_name: str, progress_callback: Optional[Callable] = None) -> bool:
@@ -164,12 +325,26 @@ class DockerManager:
     
     @staticmethod
     async def push_image_async(image_name: str, progress_callback: Optional[Callable] = None) -> bool:
-        """异步推送镜像"""
+        """
+        异步推送镜像
+
+        直接走Docker Engine HTTP API流式读取推送进度，
+        状态行用orjson解码，全程不阻塞事件循环也不占用线程。
+        """
+        repository, tag = _split_repo_tag(image_name)
         try:
-            with DockerManager.get_client() as client:
-                push_result = client.images.push(image_name, stream=True, decode=True)
-                
-                for line in push_result:
+            client = _get_async_http_client()
+            async with client.stream(
+                "POST",
+                f"/images/{repository}/push",
+                params={"tag": tag},
+                headers={"X-Registry-Auth": _registry_auth_header(repository)},
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_lines():
+                    if not chunk:
+                        continue
+                    line = orjson.loads(chunk)
                     if 'error' in line:
                         logger.error(f"推送失败: {line['error']}")
                         return False
@@ -180,12 +355,27 @@ class DockerManager:
                         else:
                             # 同步回调直接调用
                             progress_callback(line['status'])
-                
                 return True
         except Exception as e:
             logger.error(f"推送镜像失败: {e}")
             return False
     
+    @staticmethod
+    async def pull_images_async(image_names: list, max_concurrency: int = 4) -> list:
+        """
+        并发拉取多个镜像
+
+        镜像拉取是I/O密集的，批量任务的耗时由最慢的一个决定；
+        信号量限制同时进行的拉取数，避免压垮registry或本地带宽。
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _bounded_pull(name: str) -> Any:
+            async with semaphore:
+                return await DockerManager.pull_image_async(name)
+
+        return await asyncio.gather(*(_bounded_pull(name) for name in image_names))
+
     # ==================== 便捷方法 ====================
     
     @staticmethod
@@ -197,8 +387,8 @@ class DockerManager:
     @staticmethod
     async def list_images_async() -> list:
         """异步列出镜像"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.list_images)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.list_images)
     
     @staticmethod
     def remove_image(image_name: str, force: bool = False) -> bool:
@@ -214,8 +404,8 @@ class DockerManager:
     @staticmethod
     async def remove_image_async(image_name: str, force: bool = False) -> bool:
         """异步删除镜像"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_thread_pool, DockerManager.remove_image, image_name, force)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_meta_pool, DockerManager.remove_image, image_name, force)
 
 
 # 向后兼容的别名
@@ -0,0 +1,23 @@
+"""
+生产环境的gunicorn worker
+
+uvicorn.workers.UvicornWorker默认开启permessage-deflate，gzip一次的广播
+帧会被每个连接重新压缩一遍；这里继承后对齐开发入口（start.py/main.py）
+的WebSocket配置，保证容器内行为一致。
+"""
+
+from uvicorn.workers import UvicornWorker
+
+
+class ImageTransUvicornWorker(UvicornWorker):
+    """与开发入口相同配置的uvicorn worker"""
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "loop": "uvloop",
+        "http": "httptools",
+        "ws": "websockets",
+        "ws_ping_interval": 20,
+        "ws_ping_timeout": 20,
+        "ws_per_message_deflate": False,
+    }
@@ -1,8 +1,10 @@
 import asyncio
-import json
+import functools
+import gzip
 import logging
 import os
 import re
+import time
 from typing import Optional
 
 from docker_manager import DockerManager
@@ -11,6 +13,7 @@ from fastapi import WebSocket
 from fastapi import WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
+import orjson
 from pydantic import BaseModel
 
 # 配置日志
@@ -25,111 +28,149 @@ from pathlib import Path
 static_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
-# 存储活跃的WebSocket连接
-active_connections: list[WebSocket] = []
+# 启动时读入主页面，运行期不变，避免每个请求都读磁盘
+_index_html_path = static_dir / "index.html"
+try:
+    _index_html: Optional[str] = _index_html_path.read_text(encoding="utf-8")
+except OSError as e:
+    logging.getLogger(__name__).warning(f"预读主页面失败，首个请求时重试: {e}")
+    _index_html = None
+
+# 存储活跃的WebSocket连接，set保证add/remove为O(1)且不会重复记录
+active_connections: set[WebSocket] = set()
+
+# 持有后台任务的强引用，事件循环只持弱引用，否则GC可能中途取消任务
+_background_tasks: set[asyncio.Task] = set()
 
 class ImageRequest(BaseModel):
     image_name: str
     new_domain: Optional[str] = None
 
+# 单次广播的最大并发发送数，超过时分批发送避免阻塞事件循环
+BROADCAST_BATCH_SIZE = 50
+
 async def notify_progress(message: str, progress: int = 0):
     """向所有连接的WebSocket客户端发送进度更新"""
-    if active_connections:
-        data = {
-            "message": message,
-            "progress": progress,
-            "timestamp": asyncio.get_event_loop().time()
-        }
-        await asyncio.gather(
-            *[connection.send_text(json.dumps(data, ensure_ascii=False)) 
-              for connection in active_connections],
+    if not active_connections:
+        return
+
+    data = {
+        "message": message,
+        "progress": progress,
+        "timestamp": time.time()
+    }
+    # 序列化并压缩一次，所有接收方复用同一份字节
+    # （permessage-deflate已关闭，避免每个连接各自重新压缩）
+    payload = gzip.compress(orjson.dumps(data))
+
+    # 快照当前连接，防止发送过程中列表被并发修改
+    connections = tuple(active_connections)
+    dead_connections = []
+    for start in range(0, len(connections), BROADCAST_BATCH_SIZE):
+        batch = connections[start:start + BROADCAST_BATCH_SIZE]
+        results = await asyncio.gather(
+            *(connection.send_bytes(payload) for connection in batch),
             return_exceptions=True
         )
+        dead_connections.extend(
+            connection for connection, result in zip(batch, results)
+            if isinstance(result, Exception)
+        )
+        # 大规模扇出时分批让出事件循环
+        if start + BROADCAST_BATCH_SIZE < len(connections):
+            await asyncio.sleep(0)
+
+    # 统一清理失效连接
+    for connection in dead_connections:
+        active_connections.discard(connection)
+
+# 合法镜像引用之外的字符直接快速拒绝，避免在畸形输入上做逐段解析
+_INVALID_REF_CHARS_RE = re.compile(r"[^a-zA-Z0-9@:_.\-/]")
 
+@functools.lru_cache(maxsize=4096)
 def parse_image_name(image_name: str) -> tuple[str, str, str, str]:
     """
     解析镜像名称，返回 (registry, bucket, name, tag)
-    
+
+    首段含'.'、含端口(':')或为localhost时才视为registry（与Docker CLI
+    规则一致），否则视为bucket；tag缺省为latest。
+
     支持的格式:
-    - name:tag -> (docker.io, library, name, tag)
-    - name -> (docker.io, library, name, latest)
-    - library/name:tag -> (docker.io, library, name, tag)
-    - library/name -> (docker.io, library, name, latest)
-    - registry/name:tag -> (registry, library, name, tag)
-    - registry/name -> (registry, library, name, latest)
-    - registry/bucket/name:tag -> (registry, bucket, name, tag)
-    - registry/bucket/name -> (registry, bucket, name, latest)
+    - name[:tag] -> (docker.io, library, name, tag)
+    - bucket/name[:tag] -> (docker.io, bucket, name, tag)
+    - registry/name[:tag] -> (registry, library, name, tag)
+    - registry/bucket/name[:tag] -> (registry, bucket, name, tag)
     """
-    # 分离tag
-    if ':' in image_name:
-        name_part, tag = image_name.rsplit(':', 1)
+    if not image_name or _INVALID_REF_CHARS_RE.search(image_name):
+        raise ValueError(f"不支持的镜像名称格式: {image_name}")
+
+    registry = "docker.io"
+    bucket = "library"
+    first, sep, rest = image_name.partition('/')
+    if sep:
+        # 首段含'.'、端口或为localhost才算registry（Docker CLI规则），否则视为bucket
+        if '.' in first or ':' in first or first == "localhost":
+            registry = first
+            maybe_bucket, sep2, name_part = rest.partition('/')
+            if sep2:
+                bucket = maybe_bucket
+            else:
+                name_part = maybe_bucket
+        else:
+            bucket = first
+            name_part = rest
     else:
         name_part = image_name
+    name, colon, tag = name_part.partition(':')
+    if not colon:
         tag = "latest"
-    
-    # 解析路径部分
-    parts = name_part.split('/')
-    
-    if len(parts) == 1:
-        # name 或 name:tag
-        return "docker.io", "library", parts[0], tag
-    elif len(parts) == 2:
-        # 检查是否是 library/name 格式
-        if parts[0] == "library":
-            # library/name -> (docker.io, library, name, tag)
-            return "docker.io", "library", parts[1], tag
-        else:
-            # registry/name -> (registry, library, name, tag)
-            return parts[0], "library", parts[1], tag
-    elif len(parts) == 3:
-        # registry/bucket/name 或 registry/bucket/name:tag
-        return parts[0], parts[1], parts[2], tag
-    else:
-        # 不支持更多层级
+    if not name or '/' in name_part or ':' in tag:
         raise ValueError(f"不支持的镜像名称格式: {image_name}")
+    return registry, bucket, name, tag
 
+@functools.lru_cache(maxsize=1024)
 def build_source_image_name(registry: str, bucket: str, name: str, tag: str) -> str:
     """构建源镜像名称"""
     # 如果registry是docker.io且bucket是library，则省略registry
     if registry == "docker.io" and bucket == "library":
         return f"{name}:{tag}"
     # 如果只有registry和name（bucket是library），则省略bucket
-    elif bucket == "library":
+    if bucket == "library":
         return f"{registry}/{name}:{tag}"
-    else:
-        return f"{registry}/{bucket}/{name}:{tag}"
+    return f"{registry}/{bucket}/{name}:{tag}"
 
+@functools.lru_cache(maxsize=1024)
 def build_target_image_name(new_domain: str, bucket: str, name: str, tag: str) -> str:
     """构建目标镜像名称"""
-    # 目标镜像总是包含bucket，如果没有则使用library
-    if not bucket or bucket == "library":
-        return f"{new_domain}/library/{name}:{tag}"
-    else:
-        return f"{new_domain}/{bucket}/{name}:{tag}"
+    # 目标镜像总是包含bucket，如果没有则使用library；单个f-string一次分配完成
+    return f"{new_domain}/{bucket or 'library'}/{name}:{tag}"
+
+@functools.lru_cache(maxsize=1024)
+def resolve_image_names(image_name: str, new_domain: str) -> tuple[str, str, str, str]:
+    """解析镜像名称并一次性构建源/目标镜像名称，返回 (source_image, target_image, bucket, name)"""
+    registry, bucket, name, tag = parse_image_name(image_name)
+    # 最常见的docker.io/library情况走最短路径
+    if registry == "docker.io" and bucket == "library":
+        return f"{name}:{tag}", f"{new_domain}/library/{name}:{tag}", bucket, name
+    source_image = build_source_image_name(registry, bucket, name, tag)
+    target_image = build_target_image_name(new_domain, bucket, name, tag)
+    return source_image, target_image, bucket, name
 
 async def process_docker_image(image_name: str, new_domain: str):
     """处理Docker镜像：拉取、重标签、推送"""
     try:
         logger.info(f"开始处理镜像: {image_name} -> {new_domain}")
-        
-        # 解析镜像名称
+
+        # 解析并构建源/目标镜像名称
         try:
-            registry, bucket, name, tag = parse_image_name(image_name)
-            logger.info(f"解析结果: registry={registry}, bucket={bucket}, name={name}, tag={tag}")
+            source_image, target_image, bucket, name = resolve_image_names(image_name, new_domain)
+            logger.info(f"源镜像名称: {source_image}, 目标镜像名称: {target_image}")
         except ValueError as e:
             error_msg = f"错误：{str(e)}"
             await notify_progress(error_msg, 0)
             logger.error(error_msg)
             return False
-        
-        # 构建完整的源镜像名称
-        source_image = build_source_image_name(registry, bucket, name, tag)
-        logger.info(f"源镜像名称: {source_image}")
-        
-        # 构建目标镜像名称
-        target_image = build_target_image_name(new_domain, bucket, name, tag)
-        logger.info(f"目标镜像名称: {target_image}")
-        
+
         await notify_progress(f"开始处理镜像: {source_image} -> {target_image}", 10)
         
         # 拉取镜像（异步操作）
@@ -170,17 +211,23 @@ async def process_docker_image(image_name: str, new_domain: str):
         try:
             logger.info(f"开始推送镜像: {target_image}")
             
+            # 推送状态去重：相同状态在100ms内只广播一次，状态变化立即广播
+            last_status: Optional[str] = None
+            last_sent_ts = 0.0
+
             # 定义进度回调函数
             async def progress_callback(status: str):
+                nonlocal last_status, last_sent_ts
                 logger.debug(f"推送进度: {status}")
+                now = time.monotonic()
+                if status == last_status and now - last_sent_ts < 0.1:
+                    return
+                last_status = status
+                last_sent_ts = now
                 await notify_progress(f"推送状态: {status}", 95)
             
-            # 使用同步包装器来避免协程警告
-            def sync_progress_callback(status: str):
-                # 在事件循环中调度异步回调
-                asyncio.create_task(progress_callback(status))
-            
-            success = await DockerManager.push_image_async(target_image, sync_progress_callback)
+            # push_image_async会await异步回调，广播自带背压，无需再包装调度
+            success = await DockerManager.push_image_async(target_image, progress_callback)
             if not success:
                 error_msg = "推送镜像失败"
                 await notify_progress(error_msg, 0)
@@ -206,14 +253,15 @@ async def process_docker_image(image_name: str, new_domain: str):
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
+    active_connections.add(websocket)
     try:
         await notify_progress("WebSocket连接已建立", 0)
         while True:
-            # 保持连接活跃
-            await asyncio.sleep(30)
+            # 等待客户端消息，连接断开时立即抛出WebSocketDisconnect
+            # 心跳由uvicorn的ws ping帧负责
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        active_connections.discard(websocket)
         await notify_progress("WebSocket连接已断开", 0)
 
 @app.post("/process-image")
@@ -223,9 +271,11 @@ async def process_image(request: ImageRequest):
     new_domain = request.new_domain or os.getenv("NEW_DOMAIN", "gitlab.localhost:5000")
     logger.info(f"使用目标域名: {new_domain} (用户输入: {request.new_domain}, 环境变量: {os.getenv('NEW_DOMAIN')})")
     
-    # 启动异步任务处理镜像
-    asyncio.create_task(process_docker_image(request.image_name, new_domain))
-    
+    # 启动异步任务处理镜像，并持有引用直到任务结束
+    task = asyncio.create_task(process_docker_image(request.image_name, new_domain))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
     return {"message": "镜像处理已开始", "image_name": request.image_name, "target_domain": new_domain}
 
 @app.get("/health")
@@ -239,14 +289,14 @@ async def health_check():
             "status": "ok",
             "docker": docker_status,
             "docker_info": docker_info,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.time()
         }
     except Exception as e:
         return {
             "status": "error",
             "docker": "unknown",
             "docker_info": f"检查失败: {str(e)}",
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.time()
         }
 
 @app.get("/docker-status")
@@ -301,10 +351,22 @@ async def get_config():
 @app.get("/", response_class=HTMLResponse)
 async def get_index():
     """返回主页面"""
-    html_path = Path(__file__).parent / "static" / "index.html"
-    with open(html_path, "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    global _index_html
+    if _index_html is None:
+        # 导入时预读失败则在首个请求时重读
+        _index_html = _index_html_path.read_text(encoding="utf-8")
+    return HTMLResponse(content=_index_html)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+        ws_per_message_deflate=False
+    )
\ No newline at end of file
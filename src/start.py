@@ -18,5 +18,11 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+        ws_per_message_deflate=False
+    )
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+pytest公共配置
+统一把src目录加入sys.path，避免每个测试模块重复插入
+"""
+
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+# 各测试模块共用的镜像引用用例表，集中存放，加一个用例只改一处JSON
+IMG_REFS = json.loads((pathlib.Path(__file__).parent / "cases" / "image_refs.json").read_text())
+
+import pytest
+from docker_manager import DockerManager
+
+# session内只探测一次Docker守护进程；不可用时跳过依赖Docker的测试，
+# 纯逻辑测试照常运行
+_docker_available = DockerManager.test_connection()
+
+requires_docker = pytest.mark.skipif(
+    not _docker_available, reason="docker daemon not reachable"
+)
+
+
+@pytest.fixture(scope="session")
+def docker_client():
+    """session级共享的Docker客户端，整个测试会话只建立一次连接"""
+    with DockerManager.get_client() as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def docker_info(docker_client):
+    """session级缓存的Docker信息"""
+    return docker_client.info()
+
+
+@pytest.fixture(scope="session")
+def hello_world_image(docker_client):
+    """session级共享的hello-world镜像，整个测试会话只拉取一次"""
+    image = docker_client.images.pull("hello-world:latest")
+    yield image
+    docker_client.images.remove(image.id, force=True)
+
+
+@pytest.fixture
+def tagged_image(docker_client, hello_world_image):
+    """函数级的临时标签，断言失败时也保证清理"""
+    tag = "test-registry/hello-world:test"
+    hello_world_image.tag("test-registry/hello-world", tag="test")
+    yield tag
+    docker_client.images.remove(tag, force=True)
@@ -12,8 +12,12 @@ import time
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from conftest import requires_docker
 from docker_manager import DockerManager
 
+# 性能测试同样依赖Docker守护进程
+pytestmark = requires_docker
+
 
 async def test_sync_operations():
     """测试同步操作性能"""
@@ -3,142 +3,56 @@
 测试Docker SDK功能的脚本
 """
 
-import asyncio
-import os
-import sys
+import pytest
+from conftest import requires_docker
+from docker_manager import DockerManager
 
-# 添加src目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# 整个模块都依赖Docker守护进程
+pytestmark = requires_docker
 
-from docker_manager import DockerManager
+
+@pytest.fixture
+def bulk_images(docker_client, hello_world_image):
+    """批量拉取的镜像列表，测试结束后清理额外拉取的镜像
+
+    hello-world由session级fixture负责清理，这里只移除本测试
+    自己引入的alpine和busybox，失败时也保证执行。
+    """
+    yield ["hello-world:latest", "alpine:latest", "busybox:latest"]
+    for name in ("alpine:latest", "busybox:latest"):
+        docker_client.images.remove(name, force=True)
 
 
-def test_docker_connection():
+def test_docker_connection(docker_client, docker_info):
     """测试Docker连接"""
-    try:
-        print("✅ Docker客户端初始化成功")
-        
-        # 测试连接
-        if DockerManager.test_connection():
-            print("✅ Docker守护进程连接正常")
-        else:
-            print("❌ Docker连接测试失败")
-            return False
-        
-        # 获取Docker信息
-        info = DockerManager.get_docker_info()
-        if info:
-            print(f"✅ Docker版本: {info.get('ServerVersion', 'Unknown')}")
-            print(f"✅ 操作系统: {info.get('OperatingSystem', 'Unknown')}")
-        else:
-            print("⚠️  无法获取Docker信息")
-        
-        # 列出本地镜像
-        with DockerManager.get_client() as client:
-            images = client.images.list()
-            print(f"✅ 本地镜像数量: {len(images)}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ 未知错误: {e}")
-        return False
-
-async def test_image_operations_async():
-    """异步测试镜像操作"""
-    try:
-        # 测试拉取一个小镜像
-        print("\n🐳 测试异步镜像拉取...")
-        image = await DockerManager.pull_image_async("hello-world:latest")
-        print(f"✅ 成功拉取镜像: {image.short_id}")
-        
-        # 测试重标签
-        print("\n🏷️  测试异步镜像重标签...")
-        success = await DockerManager.tag_image_async(image, "test-registry", "hello-world", "test")
-        if success:
-            print("✅ 镜像重标签成功")
-        else:
-            print("❌ 镜像重标签失败")
-            return False
-        
-        # 清理测试镜像
-        print("\n🧹 清理测试镜像...")
-        with DockerManager.get_client() as client:
-            client.images.remove("test-registry/hello-world:test", force=True)
-            print("✅ 测试镜像清理完成")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ 异步镜像操作测试失败: {e}")
-        return False
-
-def test_image_operations():
-    """测试镜像操作"""
-    try:
-        # 测试拉取一个小镜像
-        print("\n🐳 测试镜像拉取...")
-        with DockerManager.get_client() as client:
-            image = client.images.pull("hello-world:latest")
-            print(f"✅ 成功拉取镜像: {image.short_id}")
-            
-            # 测试重标签
-            print("\n🏷️  测试镜像重标签...")
-            image.tag("test-registry", "hello-world", tag="test")
-            print("✅ 镜像重标签成功")
-        
-        # 清理测试镜像
-        print("\n🧹 清理测试镜像...")
-        with DockerManager.get_client() as client:
-            client.images.remove("test-registry/hello-world:test", force=True)
-            print("✅ 测试镜像清理完成")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ 镜像操作测试失败: {e}")
-        return False
-
-async def run_async_tests():
-    """运行异步测试"""
-    print("🔍 测试异步Docker SDK功能...")
-    print("=" * 50)
-    
-    # 测试连接
-    if not await DockerManager.test_connection_async():
-        print("\n❌ Docker连接测试失败，请检查Docker服务是否运行")
-        return False
-    
-    # 测试镜像操作
-    if not await test_image_operations_async():
-        print("\n❌ 异步镜像操作测试失败")
-        return False
-    
-    print("\n🎉 所有异步测试通过！Docker SDK工作正常")
-    print("=" * 50)
-    return True
+    assert DockerManager.test_connection()
+    assert docker_info is not None
+
+    images = docker_client.images.list()
+    assert isinstance(images, list)
+
+
+def test_image_operations(docker_client, tagged_image):
+    """测试镜像操作（打标签与清理由fixture完成）"""
+    assert docker_client.images.get(tagged_image) is not None
+
+
+async def test_image_operations_async(hello_world_image, tagged_image):
+    """异步测试镜像操作（清理由fixture的finalizer保证）"""
+    assert await DockerManager.tag_image_async(
+        hello_world_image, "test-registry", "hello-world", "test"
+    )
+
+
+async def test_bulk_pull_parallel(bulk_images):
+    """并发批量拉取多个小镜像（清理由fixture完成）"""
+    images = await DockerManager.pull_images_async(bulk_images, max_concurrency=4)
+
+    assert len(images) == len(bulk_images)
+    assert all(image.short_id for image in images)
 
 if __name__ == "__main__":
-    print("🔍 测试Docker SDK功能...")
-    print("=" * 50)
-    
-    # 测试连接
-    if not test_docker_connection():
-        print("\n❌ Docker连接测试失败，请检查Docker服务是否运行")
-        sys.exit(1)
-    
-    # 测试镜像操作
-    if not test_image_operations():
-        print("\n❌ 镜像操作测试失败")
-        sys.exit(1)
-    
-    print("\n🎉 所有测试通过！Docker SDK工作正常")
-    print("=" * 50)
-    
-    # 运行异步测试
-    print("\n" + "=" * 50)
-    try:
-        asyncio.run(run_async_tests())
-    except Exception as e:
-        print(f"❌ 异步测试失败: {e}")
-        sys.exit(1) 
\ No newline at end of file
+    import sys
+
+    import pytest
+    sys.exit(pytest.main([__file__]))